@@ -1,23 +1,110 @@
 import os
+import sys
 import logging
 import re
+import functools
+import pickle
+import tempfile
+from array import array
+import httpx
 import requests
-from dataclasses import dataclass
-from typing import Dict, List,  Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Any, Optional
 
 # Constants
 INDEX_URL = "https://www.rfc-editor.org/rfc-index.txt"
 RFC_URL_TEMPLATE = "https://www.rfc-editor.org/rfc/rfc{number}.txt"
 CACHE_DIR = os.path.expanduser("~/.cache/ietf-doc-server")
 DEFAULT_MAX_LINES = 200  # Default pagination limit
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # Bytes written per chunk when streaming downloads
+DOCUMENT_CACHE_SIZE = 256  # Paginated document windows kept in memory
+NOT_ISSUED = sys.intern("Not Issued")  # Title for reserved but unpublished RFCs
+MAX_INTERNED_TITLE_LENGTH = 64  # Shorter titles are interned to share repeats
+INDEX_CACHE_VERSION = 2  # Bump when the pickled RFCIndexData layout changes
+
+logger = logging.getLogger("mcp-server-ietf")
+
+# Process umask, read once so cache files keep the permissions a plain
+# open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Precompiled patterns
+# RFC numbers are typically zero-padded to 4 digits (e.g., "0001")
+# But could be 5 digits for newer RFCs
+# Index entries are matched as bytes across the whole file at once, so the
+# index is never decoded or split into lines. [^\S\n] is whitespace that
+# does not cross a line break.
+_RFC_LINE_RE_MULTI = re.compile(rb'(?m)^[^\S\n]*(\d{4,5})[^\S\n]+([^\n]+)')
+_PAGE_RE = re.compile(r'\[Page\s+(\d+)\]')
 
 @dataclass
 class RFCIndexData:
     """Data structure for RFC index information"""
     index_path: str
     docs_count: int
-    rfc_titles: Dict[str, str]  # Map of RFC number to title
+    rfc_titles: Dict[int, str]  # Map of RFC number to title
+    # (number, title, case-folded title) triples, precomputed for keyword search
+    rfc_titles_folded: List[Tuple[int, str, str]] = field(
+        default_factory=list, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        if not self.rfc_titles_folded:
+            self.rfc_titles_folded = [
+                (number, title, title.casefold())
+                for number, title in self.rfc_titles.items()
+            ]
+
+
+def _remove_if_exists(path: str) -> None:
+    """Remove a file, ignoring it if it does not exist"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+def _make_temp_file(path: str) -> Tuple[int, str]:
+    """
+    Create a unique temporary file next to path
+
+    Cache files are written to a temporary file that replaces path with
+    os.replace only once it is complete, so an interrupted write never
+    leaves a truncated file in the cache. Each writer gets its own file,
+    so concurrent downloads of the same document never write to or remove
+    each other's temporary file.
+
+    mkstemp creates the file as 0600; it is reset to the umask-derived
+    mode so the final cache file has the same permissions as before.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".",
+        prefix=os.path.basename(path) + ".",
+        suffix=".tmp"
+    )
+    try:
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+    except BaseException:
+        os.close(fd)
+        _remove_if_exists(tmp_path)
+        raise
+    return fd, tmp_path
+
+def _download_to_file(url: str, path: str) -> None:
+    """Stream a response body to path with a blocking requests call"""
+    fd, tmp_path = _make_temp_file(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            with requests.get(url, stream=True) as response:
+                response.raise_for_status()
 
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_if_exists(tmp_path)
+        raise
 
 def download_rfc_index(cache_dir: str = CACHE_DIR) -> str:
     """
@@ -37,11 +124,7 @@ def download_rfc_index(cache_dir: str = CACHE_DIR) -> str:
     # Download and cache index if not present
     if not os.path.exists(index_path):
         print(f"Downloading RFC index from {INDEX_URL}")
-        response = requests.get(INDEX_URL)
-        response.raise_for_status()
-
-        with open(index_path, "w", encoding="utf-8") as f:
-            f.write(response.text)
+        _download_to_file(INDEX_URL, index_path)
 
     return index_path
 
@@ -55,51 +138,86 @@ def parse_rfc_index(index_path: str) -> RFCIndexData:
     Returns:
         RFCIndexData with parsed information
     """
-    rfc_titles = {}
-    docs_count = 0
+    entries = []  # (RFC number, title) pairs in index order
 
-    # Parse index to extract titles and count
-    with open(index_path, "r", encoding="utf-8") as f:
-        parsing_started = False
+    # Read the whole index in one go
+    with open(index_path, "rb") as f:
+        content = f.read()
 
-        for line in f:
-            # Skip until we reach the RFC INDEX section
-            if "RFC INDEX" in line:
-                parsing_started = True
-                continue
-
-            # Only process lines after we've found the start marker
-            if not parsing_started:
-                continue
-
-            # Use regex to look for lines starting with RFC numbers
-            # RFC numbers are typically zero-padded to 4 digits (e.g., "0001")
-            # But could be 5 digits for newer RFCs
-            match = re.match(r'^\s*(\d{4}|\d{5})\s+(.+)', line)
-            if match:
-                rfc_num = match.group(1).lstrip('0')  # Remove leading zeros
-                if not rfc_num:  # In case it was all zeros
-                    rfc_num = "0"
-
-                title_text = match.group(2)
-
-                # Handle "Not Issued" RFCs
-                if "Not Issued" in title_text:
-                    rfc_titles[rfc_num] = "Not Issued"
-                else:
-                    # Extract title up to the first period or end of line
-                    title = title_text.split('.')[0].strip()
-                    rfc_titles[rfc_num] = title
-
-                docs_count += 1
+    # Skip until we reach the line after the RFC INDEX marker
+    marker = content.find(b"RFC INDEX")
+    if marker < 0:
+        start_offset = len(content)
+    else:
+        start_offset = content.find(b"\n", marker) + 1 or len(content)
 
+    # Parse index to extract titles and count
+    for match in _RFC_LINE_RE_MULTI.finditer(content, start_offset):
+        # int() drops the zero padding
+        rfc_num = int(match.group(1))
+
+        # Only the matched title is decoded
+        title_text = match.group(2).decode('utf-8', 'replace')
+
+        # Handle "Not Issued" RFCs
+        if NOT_ISSUED in title_text:
+            entries.append((rfc_num, NOT_ISSUED))
+        else:
+            # Extract title up to the first period or end of line
+            title = title_text.partition('.')[0].strip()
+            if len(title) < MAX_INTERNED_TITLE_LENGTH:
+                title = sys.intern(title)
+            entries.append((rfc_num, title))
+
+    # Build the title map in one pass once all entries are known
     return RFCIndexData(
         index_path=index_path,
-        docs_count=docs_count,
-        rfc_titles=rfc_titles
+        docs_count=len(entries),
+        rfc_titles=dict(entries)
     )
 
-def download_rfc(rfc_number: str, cache_dir: str = CACHE_DIR) -> str:
+def parse_rfc_index_cached(index_path: str) -> RFCIndexData:
+    """
+    Parse the RFC index file, reusing a pickled result when it is up to date
+
+    Args:
+        index_path: Path to the RFC index file
+
+    Returns:
+        RFCIndexData with parsed information
+    """
+    pkl_path = os.path.splitext(index_path)[0] + ".pkl"
+
+    # Reuse the pickled index if it is at least as new as the raw index
+    if (os.path.exists(pkl_path)
+            and os.path.getmtime(pkl_path) >= os.path.getmtime(index_path)):
+        try:
+            with open(pkl_path, "rb") as f:
+                version, data = pickle.load(f)
+            # Only trust pickles written with the current layout
+            if version == INDEX_CACHE_VERSION and isinstance(data, RFCIndexData):
+                return data
+        except Exception:
+            # Corrupt or incompatible cache, fall back to parsing
+            pass
+
+    data = parse_rfc_index(index_path)
+
+    # The pickle is only an optimisation, so failing to write it is not fatal
+    tmp_path = None
+    try:
+        fd, tmp_path = _make_temp_file(pkl_path)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((INDEX_CACHE_VERSION, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, pkl_path)
+    except OSError as e:
+        logger.warning("Failed to cache parsed RFC index: %s", e)
+        if tmp_path is not None:
+            _remove_if_exists(tmp_path)
+
+    return data
+
+def download_rfc(rfc_number: int, cache_dir: str = CACHE_DIR) -> str:
     """
     Download and cache a specific RFC document
 
@@ -120,40 +238,132 @@ def download_rfc(rfc_number: str, cache_dir: str = CACHE_DIR) -> str:
     if not os.path.exists(doc_path):
         url = RFC_URL_TEMPLATE.format(number=rfc_number)
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-
-            with open(doc_path, "w", encoding="utf-8") as f:
-                f.write(response.text)
+            _download_to_file(url, doc_path)
 
-        except requests.RequestException as e:
+        except (requests.RequestException, OSError) as e:
             raise Exception(f"Failed to download RFC {rfc_number}: {str(e)}")
 
     return doc_path
 
-def get_rfc_document(
-    rfc_number: str,
-    start_line: int = 1,
-    max_lines: int = 200,
+async def _stream_to_file(client: httpx.AsyncClient, url: str, path: str) -> None:
+    """Stream a response body to path through the shared async httpx client"""
+    fd, tmp_path = _make_temp_file(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_if_exists(tmp_path)
+        raise
+
+async def download_rfc_async(
+    rfc_number: int,
     cache_dir: str = CACHE_DIR,
-    index_data: Optional[RFCIndexData] = None
-) -> Dict[str, Any]:
+    client: Optional[httpx.AsyncClient] = None
+) -> str:
     """
-    Get an RFC document by its number with pagination support
+    Download and cache a specific RFC document without blocking the event loop
 
     Args:
-        rfc_number: The RFC number (e.g., "1234")
-        start_line: The line number to start from (default: 1)
-        max_lines: Maximum number of lines to return (default: 200)
+        rfc_number: The RFC number to download
         cache_dir: Directory to store cached files
-        index_data: Optional pre-loaded index data
+        client: Shared HTTP client, so connections are kept alive between calls
 
     Returns:
-        A dictionary containing the document content and metadata
+        Path to the cached RFC document
     """
-    # Validate input
-    if not rfc_number.isdigit():
-        return {"error": "RFC number must be a number"}
+    # Create cache directory if not exists
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Create cache path for this document
+    doc_path = os.path.join(cache_dir, f"rfc{rfc_number}.txt")
+
+    # Download if not cached
+    if not os.path.exists(doc_path):
+        url = RFC_URL_TEMPLATE.format(number=rfc_number)
+        try:
+            if client is None:
+                async with httpx.AsyncClient(follow_redirects=True) as own_client:
+                    await _stream_to_file(own_client, url, doc_path)
+            else:
+                await _stream_to_file(client, url, doc_path)
+
+        except (httpx.HTTPError, OSError) as e:
+            raise Exception(f"Failed to download RFC {rfc_number}: {str(e)}")
+
+    return doc_path
+
+def _build_offset_index(doc_path: str) -> array:
+    """
+    Build and cache the byte offset of every line start in a document
+
+    Args:
+        doc_path: Path to the cached document
+
+    Returns:
+        Array of line start offsets, terminated by the file size
+    """
+    offsets = array("Q", [0])
+    position = 0
+
+    with open(doc_path, "rb") as f:
+        for line in f:
+            position += len(line)
+            offsets.append(position)
+
+    # The offsets file is only an optimisation, so failing to write it is not fatal
+    tmp_path = None
+    try:
+        fd, tmp_path = _make_temp_file(doc_path + ".offsets")
+        with os.fdopen(fd, "wb") as f:
+            offsets.tofile(f)
+        os.replace(tmp_path, doc_path + ".offsets")
+    except OSError as e:
+        logger.warning("Failed to cache line offsets for %s: %s", doc_path, e)
+        if tmp_path is not None:
+            _remove_if_exists(tmp_path)
+
+    return offsets
+
+def _load_offset_index(doc_path: str) -> array:
+    """
+    Load the line offset index for a document, building it if missing or stale
+
+    Args:
+        doc_path: Path to the cached document
+
+    Returns:
+        Array of line start offsets, terminated by the file size
+    """
+    offsets_path = doc_path + ".offsets"
+
+    if (os.path.exists(offsets_path)
+            and os.path.getmtime(offsets_path) >= os.path.getmtime(doc_path)):
+        offsets = array("Q")
+        with open(offsets_path, "rb") as f:
+            raw = f.read()
+
+        # Guard against a truncated or foreign offsets file
+        if raw and len(raw) % offsets.itemsize == 0:
+            offsets.frombytes(raw)
+            if offsets[-1] == os.path.getsize(doc_path):
+                return offsets
+
+    return _build_offset_index(doc_path)
+
+def _validate_rfc_request(
+    rfc_number: int,
+    start_line: int,
+    max_lines: int
+) -> Optional[Dict[str, Any]]:
+    """Return an error dictionary if the request parameters are invalid"""
+    if rfc_number < 0:
+        return {"error": "RFC number must be 0 or greater"}
 
     if start_line < 1:
         return {"error": "start_line must be 1 or greater"}
@@ -161,43 +371,98 @@ def get_rfc_document(
     if max_lines < 1:
         return {"error": "max_lines must be 1 or greater"}
 
+    return None
+
+def _prepare_rfc_request(
+    rfc_number: int,
+    start_line: int,
+    max_lines: int,
+    cache_dir: str,
+    index_data: Optional[RFCIndexData]
+) -> Tuple[Optional[Dict[str, Any]], Optional[RFCIndexData]]:
+    """
+    Run the checks shared by get_rfc_document and get_rfc_document_async
+    before the document is downloaded
+
+    Returns:
+        An error dictionary or None, and the index data to use
+    """
+    # Validate input
+    error = _validate_rfc_request(rfc_number, start_line, max_lines)
+    if error:
+        return error, index_data
+
     # Get index data if not provided
     if index_data is None:
         index_path = download_rfc_index(cache_dir)
-        index_data = parse_rfc_index(index_path)
+        index_data = parse_rfc_index_cached(index_path)
 
     # Check if RFC exists in our index
     if rfc_number not in index_data.rfc_titles:
-        return {"error": f"RFC {rfc_number} not found in index"}
+        return {"error": f"RFC {rfc_number} not found in index"}, index_data
 
-    # Download RFC if needed
-    try:
-        doc_path = download_rfc(rfc_number, cache_dir)
-    except Exception as e:
-        return {"error": str(e)}
+    return None, index_data
+
+def _paginate_rfc_document(
+    doc_path: str,
+    rfc_number: int,
+    start_line: int,
+    max_lines: int,
+    index_data: RFCIndexData
+) -> Dict[str, Any]:
+    """Read a window of lines from a cached RFC document, reusing recent results"""
+    title = index_data.rfc_titles.get(rfc_number, "Unknown title")
+
+    # Key the cache on the file's identity too, so a replaced file is re-read
+    st = os.stat(doc_path)
+    result = _get_rfc_document_cached(
+        doc_path, start_line, max_lines, title, st.st_mtime_ns, st.st_size
+    )
+
+    # Hand out a copy so callers cannot modify the cached result
+    result = dict(result)
+    if "page_info" in result:
+        result["page_info"] = dict(result["page_info"])
+    return result
+
+@functools.lru_cache(maxsize=DOCUMENT_CACHE_SIZE)
+def _get_rfc_document_cached(
+    doc_path: str,
+    start_line: int,
+    max_lines: int,
+    title: str,
+    mtime_ns: int,
+    size: int
+) -> Dict[str, Any]:
+    """
+    Read a window of lines from a cached RFC document
 
-    # Read and paginate the document
-    with open(doc_path, "r", encoding="utf-8") as f:
-        all_lines = f.readlines()
-        total_lines = len(all_lines)
+    mtime_ns and size are only part of the cache key and identify the
+    version of the file that was read.
+    """
+    # Look up line offsets so only the requested window is read
+    offsets = _load_offset_index(doc_path)
+    total_lines = len(offsets) - 1
 
-        # Validate start_line
-        if start_line > total_lines:
-            return {"error": f"start_line ({start_line}) exceeds document length ({total_lines})"}
+    # Validate start_line
+    if start_line > total_lines:
+        return {"error": f"start_line ({start_line}) exceeds document length ({total_lines})"}
 
-        # Calculate pagination
-        end_line = min(start_line + max_lines - 1, total_lines)
-        paginated_lines = all_lines[start_line-1:end_line]
-        paginated_content = ''.join(paginated_lines)
+    # Calculate pagination
+    end_line = min(start_line + max_lines - 1, total_lines)
 
-        # Check if truncated
-        truncated = end_line < total_lines
+    # Read the window as one contiguous block and decode it once
+    start_byte = offsets[start_line-1]
+    with open(doc_path, "rb") as f:
+        f.seek(start_byte)
+        raw = f.read(offsets[end_line] - start_byte)
+    paginated_content = raw.decode("utf-8", "replace")
 
-        # Extract page numbers if available by scanning the content
-        page_info = extract_page_info(paginated_content)
+    # Check if truncated
+    truncated = end_line < total_lines
 
-    # Basic metadata
-    title = index_data.rfc_titles.get(rfc_number, "Unknown title")
+    # Extract page numbers if available by scanning the content
+    page_info = extract_page_info(paginated_content)
 
     return {
         "content": paginated_content,
@@ -213,6 +478,77 @@ def get_rfc_document(
         "next_chunk_start": end_line + 1 if truncated else None
     }
 
+def get_rfc_document(
+    rfc_number: int,
+    start_line: int = 1,
+    max_lines: int = 200,
+    cache_dir: str = CACHE_DIR,
+    index_data: Optional[RFCIndexData] = None
+) -> Dict[str, Any]:
+    """
+    Get an RFC document by its number with pagination support
+
+    Args:
+        rfc_number: The RFC number (e.g., 1234)
+        start_line: The line number to start from (default: 1)
+        max_lines: Maximum number of lines to return (default: 200)
+        cache_dir: Directory to store cached files
+        index_data: Optional pre-loaded index data
+
+    Returns:
+        A dictionary containing the document content and metadata
+    """
+    error, index_data = _prepare_rfc_request(
+        rfc_number, start_line, max_lines, cache_dir, index_data
+    )
+    if error:
+        return error
+
+    # Download RFC if needed
+    try:
+        doc_path = download_rfc(rfc_number, cache_dir)
+    except Exception as e:
+        return {"error": str(e)}
+
+    return _paginate_rfc_document(doc_path, rfc_number, start_line, max_lines, index_data)
+
+async def get_rfc_document_async(
+    rfc_number: int,
+    start_line: int = 1,
+    max_lines: int = 200,
+    cache_dir: str = CACHE_DIR,
+    index_data: Optional[RFCIndexData] = None,
+    client: Optional[httpx.AsyncClient] = None
+) -> Dict[str, Any]:
+    """
+    Get an RFC document by its number with pagination support, downloading
+    it asynchronously if it is not cached yet
+
+    Args:
+        rfc_number: The RFC number (e.g., 1234)
+        start_line: The line number to start from (default: 1)
+        max_lines: Maximum number of lines to return (default: 200)
+        cache_dir: Directory to store cached files
+        index_data: Optional pre-loaded index data
+        client: Shared HTTP client used for the download
+
+    Returns:
+        A dictionary containing the document content and metadata
+    """
+    error, index_data = _prepare_rfc_request(
+        rfc_number, start_line, max_lines, cache_dir, index_data
+    )
+    if error:
+        return error
+
+    # Download RFC if needed
+    try:
+        doc_path = await download_rfc_async(rfc_number, cache_dir, client)
+    except Exception as e:
+        return {"error": str(e)}
+
+    return _paginate_rfc_document(doc_path, rfc_number, start_line, max_lines, index_data)
+
 def extract_page_info(content: str) -> Dict[str, Any]:
     """Extract page numbers from RFC content if available"""
     page_info = {
@@ -221,17 +557,32 @@ def extract_page_info(content: str) -> Dict[str, Any]:
         "last_page": None
     }
 
-    # Look for page markers like "[Page X]" in the content
-    page_matches = re.findall(r'\[Page\s+(\d+)\]', content)
-
-    if page_matches:
-        page_info["pages_found"] = True
-        page_info["first_page"] = int(page_matches[0])
-        page_info["last_page"] = int(page_matches[-1])
+    # Most windows hold no marker at all, so skip the regex for them
+    if '[Page' not in content:
+        return page_info
+
+    # Look for the first page marker like "[Page X]" in the content
+    first_match = _PAGE_RE.search(content)
+    if first_match is None:
+        return page_info
+
+    # Scan backwards from the end for the last marker
+    last_match = first_match
+    idx = content.rfind('[Page', first_match.end())
+    while idx >= 0:
+        match = _PAGE_RE.match(content, idx)
+        if match:
+            last_match = match
+            break
+        idx = content.rfind('[Page', first_match.end(), idx)
+
+    page_info["pages_found"] = True
+    page_info["first_page"] = int(first_match.group(1))
+    page_info["last_page"] = int(last_match.group(1))
 
     return page_info
 
-def search_rfc_by_keyword(keyword: str, index_data: RFCIndexData) -> List[Dict[str, str]]:
+def search_rfc_by_keyword(keyword: str, index_data: RFCIndexData) -> List[Dict[str, Any]]:
     """
     Search for RFC documents by keyword in their titles
 
@@ -242,13 +593,17 @@ def search_rfc_by_keyword(keyword: str, index_data: RFCIndexData) -> List[Dict[s
     Returns:
         A list of matching RFCs with their numbers and titles
     """
-    results = []
-
-    for number, title in index_data.rfc_titles.items():
-        if keyword.lower() in title.lower():
-            results.append({
-                "number": number,
-                "title": title
-            })
-
-    return results
+    # Every title contains the empty string, so skip the scan
+    if not keyword:
+        return [
+            {"number": number, "title": title}
+            for number, title in index_data.rfc_titles.items()
+        ]
+
+    keyword = keyword.casefold()
+
+    return [
+        {"number": number, "title": title}
+        for number, title, title_folded in index_data.rfc_titles_folded
+        if keyword in title_folded
+    ]
@@ -1,8 +1,9 @@
 import os
 import logging
+import httpx
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Dict, List,  Any
-from .rfc_parser import download_rfc_index, parse_rfc_index, RFCIndexData, get_rfc_document
+from .rfc_parser import download_rfc_index, parse_rfc_index_cached, RFCIndexData, get_rfc_document_async, search_rfc_by_keyword
 from mcp.server.fastmcp import FastMCP, Context
 from dotenv import load_dotenv
 
@@ -31,6 +32,9 @@ logging.basicConfig(
 
 logger = logging.getLogger("mcp-server-ietf")
 
+# Shared HTTP client for RFC downloads, created by server_lifespan
+_client: httpx.AsyncClient | None = None
+
 @asynccontextmanager
 async def server_lifespan(server: FastMCP) -> AsyncIterator[RFCIndexData]:
     """Initialize server resources and load/cache the RFC index"""
@@ -41,14 +45,22 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[RFCIndexData]:
 
     # Download and cache index if not present
     download_rfc_index(CACHE_DIR)
-    data = parse_rfc_index(index_path)
-    logger.debug(f"data :{data}")
+    data = parse_rfc_index_cached(index_path)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("data :%r", data)
+
+    # Keep connections to the RFC editor alive between downloads
+    global _client
+    _client = httpx.AsyncClient(
+        follow_redirects=True,
+        limits=httpx.Limits(max_keepalive_connections=8),
+    )
 
     try:
         yield data
     finally:
-        # Cleanup if needed
-        pass
+        await _client.aclose()
+        _client = None
 
 
 # Create MCP server with lifespan
@@ -60,9 +72,7 @@ def list_ietf_docs_number(ctx: Context) -> int:
     """
     Get the total number of IETF RFC documents available in RFC editor Index
     """
-    server_ctx = ctx.request_context.lifespan_context
-    logger.debug(f"doc count:{server_ctx.docs_count}")
-    return server_ctx.docs_count
+    return ctx.request_context.lifespan_context.docs_count
 
 @mcp.tool()
 async def get_ietf_doc(
@@ -75,7 +85,7 @@ async def get_ietf_doc(
     Get an RFC document by its number in RFC editor Index with pagination support
 
     Args:
-        number: The RFC number str (e.g., "1234")
+        number: The RFC number (e.g., 1234)
         start_line: The line number to start from (default: 1)
         max_lines: Maximum number of lines to return (default: 200)
 
@@ -83,16 +93,17 @@ async def get_ietf_doc(
         A dictionary containing the document content and metadata
     """
     server_ctx = ctx.request_context.lifespan_context
-    data = get_rfc_document(str(number),
-                                       start_line,
-                                       max_lines,
-                                       CACHE_DIR, server_ctx)
-    logger.debug(f"get_doc: {data}")
+    data = await get_rfc_document_async(number,
+                                        start_line,
+                                        max_lines,
+                                        CACHE_DIR, server_ctx, _client)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("get_doc: %r", data)
     return data
 
 
 @mcp.tool()
-def search_ietf_rfc_by_keyword(keyword: str, ctx: Context) -> List[Dict[str, str]]:
+def search_ietf_rfc_by_keyword(keyword: str, ctx: Context) -> List[Dict[str, Any]]:
     """
     Search for IETF RFC documents from RFC Editor Index by keyword in their titles
 
@@ -103,16 +114,10 @@ def search_ietf_rfc_by_keyword(keyword: str, ctx: Context) -> List[Dict[str, str
         A list of matching RFCs with their numbers and titles
     """
     server_ctx = ctx.request_context.lifespan_context
-    results = []
-
-    for number, title in server_ctx.rfc_titles.items():
-        if keyword.lower() in title.lower():
-            results.append({
-                "number": number,
-                "title": title
-            })
+    results = search_rfc_by_keyword(keyword, server_ctx)
 
-    logger.debug(f"search_rfc_by_keyword: {results}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("search_rfc_by_keyword: %r", results)
     return results
 
 def serve():
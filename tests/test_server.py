@@ -1,14 +1,18 @@
 import os
+import asyncio
+import httpx
 import pytest
 import tempfile
 import textwrap
 import requests
 from unittest.mock import patch, mock_open, MagicMock
 from mcp_server_ietf.rfc_parser import (
-    download_rfc_index, parse_rfc_index, download_rfc,
+    download_rfc_index, parse_rfc_index, parse_rfc_index_cached,
+    download_rfc, download_rfc_async,
     get_rfc_document, extract_page_info, search_rfc_by_keyword,
-    RFCIndexData
+    RFCIndexData, _load_offset_index, _get_rfc_document_cached
 )
+from mcp_server_ietf import server
 
 @pytest.fixture
 def sample_rfc_index():
@@ -57,18 +61,18 @@ def test_parse_rfc_index_counts_correctly(sample_rfc_index):
         assert result.docs_count == 5
 
         # Check that all RFC numbers are parsed correctly
-        assert "1" in result.rfc_titles  # Note: leading zeros are removed
-        assert "2" in result.rfc_titles
-        assert "14" in result.rfc_titles
-        assert "26" in result.rfc_titles
-        assert "9748" in result.rfc_titles
+        assert 1 in result.rfc_titles  # Note: numbers are stored as ints
+        assert 2 in result.rfc_titles
+        assert 14 in result.rfc_titles
+        assert 26 in result.rfc_titles
+        assert 9748 in result.rfc_titles
 
         # Check titles are parsed correctly
-        assert result.rfc_titles["1"] == "Host Software"
-        assert result.rfc_titles["2"] == "Host software"
-        assert result.rfc_titles["14"] == "Not Issued"
-        assert result.rfc_titles["26"] == "Not Issued"
-        assert result.rfc_titles["9748"] == "The Latest RFC"
+        assert result.rfc_titles[1] == "Host Software"
+        assert result.rfc_titles[2] == "Host software"
+        assert result.rfc_titles[14] == "Not Issued"
+        assert result.rfc_titles[26] == "Not Issued"
+        assert result.rfc_titles[9748] == "The Latest RFC"
 
     finally:
         # Clean up the temporary file
@@ -77,7 +81,7 @@ def test_parse_rfc_index_counts_correctly(sample_rfc_index):
 
 def test_parse_rfc_index_empty_file():
     """Test parsing with an empty file"""
-    with patch('builtins.open', mock_open(read_data="")):
+    with patch('builtins.open', mock_open(read_data=b"")):
         result = parse_rfc_index("dummy_path")
 
         assert result.docs_count == 0
@@ -99,29 +103,63 @@ def test_parse_rfc_index_handles_edge_cases():
       0042 Indented number. Author. Date. (Format: TXT)
     """)
 
-    # Mock the file open
-    with patch('builtins.open', mock_open(read_data=sample)):
+    # Mock the file open (the index is read in binary mode)
+    with patch('builtins.open', mock_open(read_data=sample.encode())):
         result = parse_rfc_index("dummy_path")
 
         # Should handle zero
-        assert "0" in result.rfc_titles
-        assert result.rfc_titles["0"] == "Zero RFC"
+        assert 0 in result.rfc_titles
+        assert result.rfc_titles[0] == "Zero RFC"
 
         # Should handle extra leading zeros
-        assert "1" in result.rfc_titles
-        assert result.rfc_titles["1"] == "Leading zeros"
+        assert 1 in result.rfc_titles
+        assert result.rfc_titles[1] == "Leading zeros"
 
         # Should handle 5-digit RFCs
-        assert "12345" in result.rfc_titles
-        assert result.rfc_titles["12345"] == "Five digits"
+        assert 12345 in result.rfc_titles
+        assert result.rfc_titles[12345] == "Five digits"
 
         # Should handle indentation
-        assert "42" in result.rfc_titles
-        assert result.rfc_titles["42"] == "Indented number"
+        assert 42 in result.rfc_titles
+        assert result.rfc_titles[42] == "Indented number"
 
         # Total count should be 4
         assert result.docs_count == 4
 
+def test_parse_rfc_index_cached_reuses_pickle(sample_rfc_index):
+    """Test that the parsed index is pickled and reused on the next load"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = os.path.join(temp_dir, "rfc-index.txt")
+        with open(index_path, "w") as f:
+            f.write(sample_rfc_index)
+
+        # First load parses the raw index and writes the pickle
+        result = parse_rfc_index_cached(index_path)
+        assert result.docs_count == 5
+        assert os.path.exists(os.path.join(temp_dir, "rfc-index.pkl"))
+
+        # Second load should not touch the regex parser
+        with patch('mcp_server_ietf.rfc_parser.parse_rfc_index') as mock_parse:
+            cached = parse_rfc_index_cached(index_path)
+
+            mock_parse.assert_not_called()
+            assert cached == result
+
+def test_parse_rfc_index_cached_survives_pickle_write_failure(sample_rfc_index):
+    """Test that failing to write the pickle still returns the parsed index"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = os.path.join(temp_dir, "rfc-index.txt")
+        with open(index_path, "w") as f:
+            f.write(sample_rfc_index)
+
+        with patch('mcp_server_ietf.rfc_parser.os.replace',
+                  side_effect=OSError("No space left on device")):
+            result = parse_rfc_index_cached(index_path)
+
+        assert result.docs_count == 5
+        # Neither the pickle nor its temporary file is left behind
+        assert os.listdir(temp_dir) == ["rfc-index.txt"]
+
 
 # Tests for download_rfc_index
 def test_download_rfc_index_cached():
@@ -145,7 +183,8 @@ def test_download_rfc_index_not_cached():
     with tempfile.TemporaryDirectory() as temp_dir:
         # Mock the requests.get response
         mock_response = MagicMock()
-        mock_response.text = "Downloaded RFC index content"
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_content.return_value = [b"Downloaded RFC ", b"index content"]
 
         with patch('requests.get', return_value=mock_response) as mock_get:
             result = download_rfc_index(temp_dir)
@@ -164,7 +203,7 @@ def test_download_rfc_cached():
     """Test download_rfc when file is already cached"""
     with tempfile.TemporaryDirectory() as temp_dir:
         # Create a fake cached RFC file
-        rfc_num = "2119"
+        rfc_num = 2119
         cache_file = os.path.join(temp_dir, f"rfc{rfc_num}.txt")
         with open(cache_file, "w") as f:
             f.write("This is a cached RFC")
@@ -180,11 +219,12 @@ def test_download_rfc_cached():
 def test_download_rfc_not_cached():
     """Test download_rfc when file needs to be downloaded"""
     with tempfile.TemporaryDirectory() as temp_dir:
-        rfc_num = "2119"
+        rfc_num = 2119
 
         # Mock the requests.get response
         mock_response = MagicMock()
-        mock_response.text = "Downloaded RFC content"
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_content.return_value = [b"Downloaded RFC ", b"content"]
 
         with patch('requests.get', return_value=mock_response) as mock_get:
             result = download_rfc(rfc_num, temp_dir)
@@ -193,7 +233,7 @@ def test_download_rfc_not_cached():
             expected_path = os.path.join(temp_dir, f"rfc{rfc_num}.txt")
             assert result == expected_path
             mock_get.assert_called_once_with(
-                f"https://www.rfc-editor.org/rfc/rfc{rfc_num}.txt"
+                f"https://www.rfc-editor.org/rfc/rfc{rfc_num}.txt", stream=True
             )
 
             # Check the content was saved
@@ -203,7 +243,7 @@ def test_download_rfc_not_cached():
 def test_download_rfc_failed():
     """Test download_rfc when download fails"""
     with tempfile.TemporaryDirectory() as temp_dir:
-        rfc_num = "2119"
+        rfc_num = 2119
 
         # Mock a failed request
         mock_error = requests.RequestException("Network error")
@@ -215,6 +255,109 @@ def test_download_rfc_failed():
             assert f"Failed to download RFC {rfc_num}" in str(exc_info.value)
             assert "Network error" in str(exc_info.value)
 
+def test_download_rfc_interrupted_leaves_no_file():
+    """Test download_rfc does not cache a partially written document"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rfc_num = 2119
+
+        def interrupted_body(chunk_size):
+            yield b"Partial RFC content"
+            raise requests.ConnectionError("Connection reset")
+
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_content.side_effect = interrupted_body
+
+        with patch('requests.get', return_value=mock_response):
+            with pytest.raises(Exception) as exc_info:
+                download_rfc(rfc_num, temp_dir)
+
+        assert "Connection reset" in str(exc_info.value)
+        assert os.listdir(temp_dir) == []
+
+def test_download_rfc_uses_umask_permissions():
+    """Test downloaded files get the umask-derived mode, not mkstemp's 0600"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_content.return_value = [b"Downloaded RFC content"]
+
+        umask = os.umask(0)
+        os.umask(umask)
+
+        with patch('requests.get', return_value=mock_response):
+            result = download_rfc(2119, temp_dir)
+
+        assert os.stat(result).st_mode & 0o777 == 0o666 & ~umask
+
+# Tests for download_rfc_async
+def test_download_rfc_async_not_cached():
+    """Test download_rfc_async downloads through the shared client"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rfc_num = 2119
+        requested = []
+
+        def handler(request):
+            requested.append(str(request.url))
+            return httpx.Response(200, text="Downloaded RFC content")
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await download_rfc_async(rfc_num, temp_dir, client)
+
+        result = asyncio.run(run())
+
+        assert result == os.path.join(temp_dir, f"rfc{rfc_num}.txt")
+        assert requested == [f"https://www.rfc-editor.org/rfc/rfc{rfc_num}.txt"]
+        with open(result, 'r') as f:
+            assert f.read() == "Downloaded RFC content"
+
+def test_download_rfc_async_failed():
+    """Test download_rfc_async when the server returns an error"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rfc_num = 2119
+        transport = httpx.MockTransport(lambda request: httpx.Response(404))
+
+        async def run():
+            async with httpx.AsyncClient(transport=transport) as client:
+                return await download_rfc_async(rfc_num, temp_dir, client)
+
+        with pytest.raises(Exception) as exc_info:
+            asyncio.run(run())
+
+        assert f"Failed to download RFC {rfc_num}" in str(exc_info.value)
+        assert not os.path.exists(os.path.join(temp_dir, f"rfc{rfc_num}.txt"))
+
+def test_download_rfc_async_overlapping_downloads():
+    """Test overlapping downloads of the same RFC do not corrupt each other"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rfc_num = 1
+        body = [b"A" * 70000, b"B" * 70000, b"C" * 70000]
+
+        async def slow_body():
+            for chunk in body:
+                await asyncio.sleep(0.01)
+                yield chunk
+
+        def handler(request):
+            return httpx.Response(200, content=slow_body())
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                return await asyncio.gather(
+                    download_rfc_async(rfc_num, temp_dir, client),
+                    download_rfc_async(rfc_num, temp_dir, client)
+                )
+
+        results = asyncio.run(run())
+
+        expected_path = os.path.join(temp_dir, f"rfc{rfc_num}.txt")
+        assert results == [expected_path, expected_path]
+        with open(expected_path, 'rb') as f:
+            assert f.read() == b"".join(body)
+        # No temporary files are left behind
+        assert os.listdir(temp_dir) == [f"rfc{rfc_num}.txt"]
+
 # Tests for extract_page_info
 def test_extract_page_info_no_pages():
     """Test extract_page_info with content having no page markers"""
@@ -254,6 +397,20 @@ def test_extract_page_info_with_single_page():
     assert result["first_page"] == 42
     assert result["last_page"] == 42
 
+def test_extract_page_info_ignores_malformed_trailing_marker():
+    """Test extract_page_info skips trailing text that only looks like a marker"""
+    content = """
+    [Page 3]
+    More content
+    [Page 4]
+    See [Page ii] and [Page
+    """
+    result = extract_page_info(content)
+
+    assert result["pages_found"] is True
+    assert result["first_page"] == 3
+    assert result["last_page"] == 4
+
 # Tests for search_rfc_by_keyword
 def test_search_rfc_by_keyword_matches():
     """Test search_rfc_by_keyword with matching keywords"""
@@ -262,9 +419,9 @@ def test_search_rfc_by_keyword_matches():
         index_path="dummy_path",
         docs_count=3,
         rfc_titles={
-            "1": "Host Software",
-            "2": "Host software implementation",
-            "3": "Network Protocol"
+            1: "Host Software",
+            2: "Host software implementation",
+            3: "Network Protocol"
         }
     )
 
@@ -272,8 +429,20 @@ def test_search_rfc_by_keyword_matches():
     results = search_rfc_by_keyword("host", index_data)
 
     assert len(results) == 2
-    assert {"number": "1", "title": "Host Software"} in results
-    assert {"number": "2", "title": "Host software implementation"} in results
+    assert {"number": 1, "title": "Host Software"} in results
+    assert {"number": 2, "title": "Host software implementation"} in results
+
+def test_search_rfc_by_keyword_casefolds():
+    """Test search_rfc_by_keyword matches case variants beyond lower()"""
+    index_data = RFCIndexData(
+        index_path="dummy_path",
+        docs_count=1,
+        rfc_titles={1: "STRASSE Routing"}
+    )
+
+    results = search_rfc_by_keyword("straße", index_data)
+
+    assert results == [{"number": 1, "title": "STRASSE Routing"}]
 
 def test_search_rfc_by_keyword_no_matches():
     """Test search_rfc_by_keyword with no matching keywords"""
@@ -282,9 +451,9 @@ def test_search_rfc_by_keyword_no_matches():
         index_path="dummy_path",
         docs_count=3,
         rfc_titles={
-            "1": "Host Software",
-            "2": "Host software implementation",
-            "3": "Network Protocol"
+            1: "Host Software",
+            2: "Host software implementation",
+            3: "Network Protocol"
         }
     )
 
@@ -293,6 +462,24 @@ def test_search_rfc_by_keyword_no_matches():
 
     assert len(results) == 0
 
+def test_search_rfc_by_keyword_empty_keyword():
+    """Test search_rfc_by_keyword returns every RFC for an empty keyword"""
+    index_data = RFCIndexData(
+        index_path="dummy_path",
+        docs_count=2,
+        rfc_titles={
+            1: "Host Software",
+            3: "Network Protocol"
+        }
+    )
+
+    results = search_rfc_by_keyword("", index_data)
+
+    assert results == [
+        {"number": 1, "title": "Host Software"},
+        {"number": 3, "title": "Network Protocol"}
+    ]
+
 def test_search_rfc_by_keyword_empty_index():
     """Test search_rfc_by_keyword with empty index"""
     # Create empty index data
@@ -307,7 +494,34 @@ def test_search_rfc_by_keyword_empty_index():
 
     assert len(results) == 0
 
+def test_search_ietf_rfc_by_keyword_tool_delegates_to_parser():
+    """Test the MCP search tool returns the parser's search results"""
+    index_data = RFCIndexData(
+        index_path="dummy_path",
+        docs_count=2,
+        rfc_titles={
+            1: "Host Software",
+            3: "Network Protocol"
+        }
+    )
+    ctx = MagicMock()
+    ctx.request_context.lifespan_context = index_data
+
+    with patch('mcp_server_ietf.server.search_rfc_by_keyword',
+              wraps=search_rfc_by_keyword) as mock_search:
+        results = server.search_ietf_rfc_by_keyword("HOST", ctx)
+
+        mock_search.assert_called_once_with("HOST", index_data)
+        assert results == [{"number": 1, "title": "Host Software"}]
+
 # Tests for get_rfc_document
+@pytest.fixture(autouse=True)
+def clear_document_cache():
+    """Start every test with an empty document window cache"""
+    _get_rfc_document_cached.cache_clear()
+    yield
+    _get_rfc_document_cached.cache_clear()
+
 @pytest.fixture
 def mock_index_data():
     """Fixture for mock index data"""
@@ -315,31 +529,31 @@ def mock_index_data():
         index_path="dummy_path",
         docs_count=2,
         rfc_titles={
-            "1": "Host Software",
-            "2": "Host software implementation"
+            1: "Host Software",
+            2: "Host software implementation"
         }
     )
 
 def test_get_rfc_document_validation_errors():
     """Test validation errors in get_rfc_document"""
     # Test invalid RFC number
-    result = get_rfc_document("abc")
+    result = get_rfc_document(-1)
     assert "error" in result
-    assert "RFC number must be a number" in result["error"]
+    assert "RFC number must be 0 or greater" in result["error"]
 
     # Test invalid start_line
-    result = get_rfc_document("1", start_line=0)
+    result = get_rfc_document(1, start_line=0)
     assert "error" in result
     assert "start_line must be 1 or greater" in result["error"]
 
     # Test invalid max_lines
-    result = get_rfc_document("1", max_lines=0)
+    result = get_rfc_document(1, max_lines=0)
     assert "error" in result
     assert "max_lines must be 1 or greater" in result["error"]
 
 def test_get_rfc_document_not_in_index(mock_index_data):
     """Test get_rfc_document with RFC not in index"""
-    result = get_rfc_document("999", index_data=mock_index_data)
+    result = get_rfc_document(999, index_data=mock_index_data)
 
     assert "error" in result
     assert "RFC 999 not found in index" in result["error"]
@@ -350,13 +564,13 @@ def test_get_rfc_document_download_error():
     index_data = RFCIndexData(
         index_path="dummy_path",
         docs_count=1,
-        rfc_titles={"1": "Host Software"}
+        rfc_titles={1: "Host Software"}
     )
 
     # Mock download_rfc to raise an exception
     with patch('mcp_server_ietf.rfc_parser.download_rfc',
               side_effect=Exception("Download failed")):
-        result = get_rfc_document("1", index_data=index_data)
+        result = get_rfc_document(1, index_data=index_data)
 
         assert "error" in result
         assert "Download failed" in result["error"]
@@ -365,7 +579,7 @@ def test_get_rfc_document_success():
     """Test successful get_rfc_document"""
     with tempfile.TemporaryDirectory() as temp_dir:
         # Create a mock RFC file
-        rfc_num = "1"
+        rfc_num = 1
         rfc_path = os.path.join(temp_dir, f"rfc{rfc_num}.txt")
         rfc_content = "Line 1\nLine 2\nLine 3\nLine 4\nLine 5\n"
         with open(rfc_path, "w") as f:
@@ -404,7 +618,7 @@ def test_get_rfc_document_pagination_edge_cases():
     """Test pagination edge cases in get_rfc_document"""
     with tempfile.TemporaryDirectory() as temp_dir:
         # Create a mock RFC file
-        rfc_num = "1"
+        rfc_num = 1
         rfc_path = os.path.join(temp_dir, f"rfc{rfc_num}.txt")
         rfc_content = "Line 1\nLine 2\nLine 3\nLine 4\nLine 5\n"
         with open(rfc_path, "w") as f:
@@ -447,7 +661,7 @@ def test_get_rfc_document_with_page_info():
     """Test get_rfc_document with page info extraction"""
     with tempfile.TemporaryDirectory() as temp_dir:
         # Create a mock RFC file with page markers
-        rfc_num = "1"
+        rfc_num = 1
         rfc_path = os.path.join(temp_dir, f"rfc{rfc_num}.txt")
         rfc_content = "Line 1\n[Page 1]\nLine 3\n[Page 2]\nLine 5\n"
         with open(rfc_path, "w") as f:
@@ -473,3 +687,94 @@ def test_get_rfc_document_with_page_info():
             assert result["page_info"]["pages_found"] is True
             assert result["page_info"]["first_page"] == 1
             assert result["page_info"]["last_page"] == 2
+
+# Tests for _load_offset_index
+def test_load_offset_index_builds_and_reuses_cache():
+    """Test that line offsets are computed once and cached next to the document"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rfc_path = os.path.join(temp_dir, "rfc1.txt")
+        with open(rfc_path, "w") as f:
+            f.write("Line 1\nLine 2\nLast line without newline")
+
+        offsets = _load_offset_index(rfc_path)
+
+        assert list(offsets) == [0, 7, 14, 39]
+        assert os.path.exists(rfc_path + ".offsets")
+
+        # A second load should come from the cached offsets file
+        with patch('mcp_server_ietf.rfc_parser._build_offset_index') as mock_build:
+            cached = _load_offset_index(rfc_path)
+
+            mock_build.assert_not_called()
+            assert list(cached) == list(offsets)
+
+def test_get_rfc_document_reuses_cached_window():
+    """Test that repeated requests for the same window skip file reads"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rfc_num = 1
+        rfc_path = os.path.join(temp_dir, f"rfc{rfc_num}.txt")
+        with open(rfc_path, "w") as f:
+            f.write("Line 1\n[Page 1]\nLine 3\n")
+
+        index_data = RFCIndexData(
+            index_path="dummy_path",
+            docs_count=1,
+            rfc_titles={rfc_num: "Host Software"}
+        )
+
+        with patch('mcp_server_ietf.rfc_parser.download_rfc',
+                  return_value=rfc_path):
+            first = get_rfc_document(rfc_num, cache_dir=temp_dir, index_data=index_data)
+
+            # Mutating a returned result must not leak into the cache
+            first["page_info"]["first_page"] = 99
+
+            with patch('mcp_server_ietf.rfc_parser._load_offset_index') as mock_load:
+                second = get_rfc_document(rfc_num, cache_dir=temp_dir, index_data=index_data)
+
+                mock_load.assert_not_called()
+                assert second["content"] == "Line 1\n[Page 1]\nLine 3\n"
+                assert second["page_info"]["first_page"] == 1
+
+def test_get_rfc_document_rereads_replaced_file():
+    """Test that a rewritten document is not served from the window cache"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rfc_num = 1
+        rfc_path = os.path.join(temp_dir, f"rfc{rfc_num}.txt")
+        with open(rfc_path, "w") as f:
+            f.write("Old line 1\nOld line 2\n")
+
+        index_data = RFCIndexData(
+            index_path="dummy_path",
+            docs_count=1,
+            rfc_titles={rfc_num: "Host Software"}
+        )
+
+        with patch('mcp_server_ietf.rfc_parser.download_rfc',
+                  return_value=rfc_path):
+            first = get_rfc_document(rfc_num, cache_dir=temp_dir, index_data=index_data)
+            assert first["content"] == "Old line 1\nOld line 2\n"
+
+            # Replace the cached file with new content
+            with open(rfc_path, "w") as f:
+                f.write("New line 1\nNew line 2\nNew line 3\n")
+
+            second = get_rfc_document(rfc_num, cache_dir=temp_dir, index_data=index_data)
+
+            assert second["content"] == "New line 1\nNew line 2\nNew line 3\n"
+            assert second["total_lines"] == 3
+
+def test_load_offset_index_survives_offsets_write_failure():
+    """Test that failing to write the offsets file still returns the offsets"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        rfc_path = os.path.join(temp_dir, "rfc1.txt")
+        with open(rfc_path, "w") as f:
+            f.write("Line 1\nLine 2\n")
+
+        with patch('mcp_server_ietf.rfc_parser.os.replace',
+                  side_effect=OSError("Read-only file system")):
+            offsets = _load_offset_index(rfc_path)
+
+        assert list(offsets) == [0, 7, 14]
+        # Neither the offsets file nor its temporary file is left behind
+        assert os.listdir(temp_dir) == ["rfc1.txt"]